@@ -36,7 +36,8 @@ class FlowControl:
         self.ob = ob
         self.mux = mux
         self.muxd = muxd
-        self.retry_count = 3 
+        self.retry_count = 3
+        self._p2_settle_until = 0.0 # Monotonic deadline of the post-vent settle window
         
         # Calibration Constants (Volume = slope * time + intercept)
         self.s_slope = s_slope
@@ -45,7 +46,17 @@ class FlowControl:
         self.ag_intercept = ag_intercept
         self.tol_slope = tol_slope
         self.tol_intercept = tol_intercept
-        
+
+        # Per-target dispatch table: [slope, intercept, inject_func].
+        # 'tol' and 'toluene' share one mutable entry so they stay in sync.
+        tol_entry = [tol_slope, tol_intercept, self.inject_toluene]
+        self._targets = {
+            's': [s_slope, s_intercept, self.inject_precursor_s],
+            'ag': [ag_slope, ag_intercept, self.inject_precursor_ag],
+            'tol': tol_entry,
+            'toluene': tol_entry,
+        }
+
     # --- Internal Helpers ---
     
     def _ensure_p1_pressure(self, pressure: float, wait: float = 5.0) -> None:
@@ -55,23 +66,45 @@ class FlowControl:
             if pressure != 0:
                 time.sleep(wait)
 
+    def _wait_p2_settled(self) -> None:
+        """
+        Blocks until the post-vent settle window on P2 has elapsed.
+
+        collect_product records the settle deadline instead of sleeping, so
+        P1-side work (e.g. the next rinse injection) proceeds during the
+        settle and only the next P2 operation pays the remaining wait.
+        """
+        remaining = self._p2_settle_until - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+
     def _toggle_valve_retry(self, valve_number: int, desired_state: int, delay: float) -> None:
         """
-        Switches a valve with robust retry logic.
+        Switches a valve and polls the read-back state until the hardware
+        confirms it, instead of sleeping a fixed delay per attempt.
         Raises FlowControlError if hardware fails to confirm state.
         """
         is_open = (desired_state == 1)
-        
-        for attempt in range(self.retry_count):
-            self.mux.toggle(valve_number, is_open) 
-            time.sleep(delay)
-            
+
+        self.mux.toggle(valve_number, is_open)
+
+        # Same overall time budget as the old retry loop, but confirmation
+        # returns as soon as the bus reports the new state (~10ms cadence).
+        attempt_window = delay + 0.5
+        deadline = time.perf_counter() + delay + self.retry_count * 0.5
+        next_reissue = time.perf_counter() + attempt_window
+
+        while time.perf_counter() < deadline:
             # Verify state (Read-back)
             if self.mux.get_valve_state(valve_number) == desired_state:
-                return 
-            
-            logger.warning(f"Valve {valve_number} switching retry ({attempt + 1}/{self.retry_count})")
-            time.sleep(0.5)
+                return
+
+            now = time.perf_counter()
+            if now >= next_reissue:
+                logger.warning("Valve %d unconfirmed, re-sending command", valve_number)
+                self.mux.toggle(valve_number, is_open)
+                next_reissue = now + attempt_window
+            time.sleep(0.01)
 
         raise FlowControlError(f"Critical: Valve {valve_number} stuck. Expected state {desired_state}.")
 
@@ -121,7 +154,8 @@ class FlowControl:
         destination = destination.lower()
         if destination not in ("waste", "tube"):
             raise ValueError("Destination must be 'waste' or 'tube'")
-            
+
+        self._wait_p2_settled()
         target = 0 if destination == "waste" else 1
         
         if self.mux.get_valve_state(2) != target:
@@ -137,13 +171,17 @@ class FlowControl:
         Opens a valve for a precise duration (Time-Pressure Injection).
         Uses busy-wait for sub-second precision.
         """
-        self._toggle_valve_retry(valve_number, 1, delay) 
-        
-        # High precision timing
+        self._toggle_valve_retry(valve_number, 1, delay)
+
+        # High precision timing: sleep the bulk of the interval and only
+        # spin the last ~2ms, keeping sub-ms accuracy without pinning a core.
         start = time.perf_counter()
+        remaining = duration - 0.002
+        if remaining > 0:
+            time.sleep(remaining)
         while time.perf_counter() - start < duration:
-            pass 
-            
+            pass
+
         self._toggle_valve_retry(valve_number, 0, delay)
 
     # --- Protocol Wrappers ---
@@ -184,55 +222,55 @@ class FlowControl:
             self.muxd.switch_valve(tube_number, direction='cw')
             time.sleep(5) 
             
+        self._wait_p2_settled()
         self.ob.set_pressure(2, -1000) # Vacuum pull
         time.sleep(duration)
         self.ob.set_pressure(2, 0)     # Vent
-        time.sleep(10) 
+        # Record the settle deadline instead of sleeping; independent P1-side
+        # operations (rinse injections) overlap this window.
+        self._p2_settle_until = time.monotonic() + 10
 
     # --- Volumetric Logic (Calibration Application) ---
 
     def update_calibration(self, target: str, slope: float, intercept: float) -> None:
         """Updates calibration constants for a specific fluid."""
         t = target.lower()
+        entry = self._targets.get(t)
+        if entry is None:
+            logger.warning(f"Unknown calibration target '{target}'")
+            return
+
+        entry[0], entry[1] = slope, intercept
+
+        # Keep the legacy scalar attributes in sync
         if t == 's':
             self.s_slope, self.s_intercept = slope, intercept
         elif t == 'ag':
             self.ag_slope, self.ag_intercept = slope, intercept
-        elif t in ['tol', 'toluene']:
-            self.tol_slope, self.tol_intercept = slope, intercept
         else:
-            logger.warning(f"Unknown calibration target '{target}'")
-            return
+            self.tol_slope, self.tol_intercept = slope, intercept
+
         logger.info(f"Calibration updated for {target}: {slope:.4f}x + {intercept:.4f}")
 
     def inject_volume(self, target: str, ul: float) -> None:
         """
         Injects a specific volume (uL) by calculating the required time based on calibration.
         """
-        t = target.lower()
-        
-        if t == 's':
-            slope, inter = self.s_slope, self.s_intercept
-            func = self.inject_precursor_s
-        elif t == 'ag':
-            slope, inter = self.ag_slope, self.ag_intercept
-            func = self.inject_precursor_ag
-        elif t in ['tol', 'toluene']:
-            slope, inter = self.tol_slope, self.tol_intercept
-            func = self.inject_toluene
-        else:
-            logger.error(f"Unknown target {target}")
+        entry = self._targets.get(target.lower())
+        if entry is None:
+            logger.error("Unknown target %s", target)
             return
+        slope, inter, func = entry
 
         if slope == 0.0:
-            logger.error(f"Slope is 0 for {target}. Perform calibration first.")
+            logger.error("Slope is 0 for %s. Perform calibration first.", target)
             return
 
         # V = slope * t + intercept  =>  t = (V - intercept) / slope
         duration = (ul - inter) / slope
         
         if duration < 0:
-            logger.warning(f"Calculated negative duration ({duration:.3f}s) for {ul}uL. Skipping.")
+            logger.warning("Calculated negative duration (%.3fs) for %suL. Skipping.", duration, ul)
             return
 
         func(duration)
@@ -252,15 +290,11 @@ class FlowControl:
         Returns:
             (slope, intercept)
         """
-        all_times = []
-        all_volumes = []
-        
-        for t, masses in data_dict.items():
-            if not isinstance(masses, list): 
-                masses = [masses]
-            for m in masses:
-                all_times.append(t)
-                all_volumes.append(m / density) # Convert mass to volume
+        # Unroll {time: [masses...]} into flat arrays without Python loops
+        masses_per_time = [np.atleast_1d(m) for m in data_dict.values()]
+        times = np.fromiter(data_dict.keys(), dtype=float, count=len(data_dict))
+        all_times = np.repeat(times, [m.size for m in masses_per_time])
+        all_volumes = np.concatenate(masses_per_time) / density # Convert mass to volume
 
         slope, intercept, r_val, _, _ = linregress(all_times, all_volumes)
         
@@ -1,14 +1,31 @@
 import os
 import sys
 import time
+import queue
 import logging
 import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 from collections import deque
 import pandas as pd
 import numpy as np
 
+try:
+    # Optional: columnar spectra sink (smaller files, no CSV formatting cost)
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+try:
+    # Optional: JIT the stoichiometry kernel for large sweep grids
+    from numba import njit, prange
+    _HAS_NUMBA = True
+except ImportError:
+    _HAS_NUMBA = False
+
 # --- 1. Project Setup ---
 # Add parent directory to path to find drivers
 CURRENT_DIR = Path(__file__).parent.absolute()
@@ -19,7 +36,7 @@ if str(PARENT_DIR) not in sys.path:
 # Import Drivers
 from Hardware_Drivers.PressureController_OB import PressureController
 from Hardware_Drivers.ValveController_MuxWire import MuxWire
-from Hardware_Drivers.MultiValve_MuxDistribution import MuxDistribution
+from Hardware_Drivers.MultiValve_MuxDistribution import MuxDistribution, RotationMode
 from Hardware_Drivers.StirrerController import StirrerController
 from FlowControl import FlowControl, FlowControlError
 
@@ -41,55 +58,104 @@ TOTAL_VOLUME = 2000 # uL
 AG_CONC = 66
 S_CONC = 66
 CLEANING_TIME_TOL = 4.25
+N_PIXELS = 100 # Spectrometer pixel count
 
 # Setup Logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("Experiment")
 
 
+if _HAS_NUMBA:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _compute_volumes(ratios, dils, s_conc, ag_conc, total, ag_out, s_out, tol_out):
+        """Fills precursor/toluene volume arrays from the Ag:S stoichiometry."""
+        for i in prange(ratios.size):
+            active = total / dils[i]
+            tol_out[i] = total - active
+            ag_out[i] = active * ratios[i] * s_conc / (ag_conc + ratios[i] * s_conc)
+            s_out[i] = ag_conc * ag_out[i] / (ratios[i] * s_conc)
+
+    # Warm the JIT at import so the first real plan doesn't pay compile time
+    _compute_volumes(np.ones(1), np.ones(1), 1.0, 1.0, 1.0,
+                     np.empty(1), np.empty(1), np.empty(1))
+
+
+def fast_write_csv(path: Path, df: pd.DataFrame) -> None:
+    """
+    Writes a numeric-only DataFrame via np.savetxt, bypassing pandas'
+    generic (and much slower) to_csv path.
+    """
+    np.savetxt(path, df.to_numpy(), delimiter=',',
+               header=','.join(map(str, df.columns)), comments='', fmt='%.6g')
+
+
 def generate_experiment_plan() -> pd.DataFrame:
     """Generates the DataFrame containing all reaction ratios and parameters."""
-    # Generate Ratios
-    ratios = np.concatenate([
+    # Generate Ratios (deduplicated, first occurrence kept to preserve order)
+    ratios = np.round(np.concatenate([
         np.arange(10, 1, -1),
         np.arange(2, 0.9, -0.25),
         np.arange(1, 0.05, -0.1)
-    ])
-    
-    # Create Base DF
-    df = pd.DataFrame({'ratio': np.round(ratios, 2)})
-    df = df.drop_duplicates().reset_index(drop=True)
-    df['dilution_factor'] = 1
-    
-    # Calculate Volumes
-    active_vol = TOTAL_VOLUME / df['dilution_factor']
-    df['toluene_volume'] = np.round(TOTAL_VOLUME - active_vol, 2)
-    
-    # Ag Volume Calculation derived from stoichiometry
-    df['Ag_volume'] = (active_vol * df['ratio'] * S_CONC) / (AG_CONC + df['ratio'] * S_CONC)
-    df['S_volume'] = (AG_CONC * df['Ag_volume']) / (df['ratio'] * S_CONC)
-    
-    # Rounding
-    df['Ag_volume'] = df['Ag_volume'].round(2)
-    df['S_volume'] = df['S_volume'].round(2)
-    
-    # Metadata
-    df['frequency'] = 1
-    df['duration'] = 7200
-    df.loc[df['ratio'] <= 1, 'duration'] = 600
-    df['tube_number'] = 12
-    df['reaction_id'] = df.index + 1
-    
-    return df
+    ]), 2)
+    ratios = ratios[np.sort(np.unique(ratios, return_index=True)[1])]
+
+    # Calculate Volumes: JIT'd parallel kernel when numba is present
+    # (pays off once the sweep grid grows), fused NumPy pass otherwise.
+    dils = np.ones_like(ratios)  # dilution_factor = 1
+    ag_volume = np.empty_like(ratios)
+    s_volume = np.empty_like(ratios)
+    tol_volume = np.empty_like(ratios)
+
+    if _HAS_NUMBA:
+        _compute_volumes(ratios, dils, float(S_CONC), float(AG_CONC),
+                         float(TOTAL_VOLUME), ag_volume, s_volume, tol_volume)
+    else:
+        active_vol = TOTAL_VOLUME / dils
+        tol_volume[:] = TOTAL_VOLUME - active_vol
+        # Ag Volume Calculation derived from stoichiometry
+        ag_volume[:] = (active_vol * ratios * S_CONC) / (AG_CONC + ratios * S_CONC)
+        s_volume[:] = (AG_CONC * ag_volume) / (ratios * S_CONC)
+
+    np.round(ag_volume, 2, out=ag_volume)
+    np.round(s_volume, 2, out=s_volume)
+    np.round(tol_volume, 2, out=tol_volume)
+
+    # Single DataFrame construction from finished arrays
+    return pd.DataFrame({
+        'ratio': ratios,
+        'dilution_factor': 1,
+        'toluene_volume': tol_volume,
+        'Ag_volume': ag_volume,
+        'S_volume': s_volume,
+        'frequency': 1,
+        'duration': np.where(ratios <= 1, 600, 7200),
+        'tube_number': 12,
+        'reaction_id': np.arange(1, ratios.size + 1),
+    })
 
 def setup_hardware():
-    """Initializes all hardware connections."""
+    """
+    Initializes all hardware connections.
+
+    Each device blocks on its own port/SDK handshake, so the four
+    constructors run concurrently; total init latency drops from the sum of
+    the handshakes to the slowest one.
+    """
     try:
-        ob = PressureController(device_name_or_serial=OB1_SN)
-        mux = MuxWire(device_name=MUX_COM)
-        muxd = MuxDistribution(com_port=MUXD_COM)
-        stirrer = StirrerController(port=STIRRER_COM)
-        
+        with ThreadPoolExecutor(max_workers=4) as ex:
+            futures = {
+                'ob': ex.submit(PressureController, device_name_or_serial=OB1_SN),
+                'mux': ex.submit(MuxWire, device_name=MUX_COM),
+                'muxd': ex.submit(MuxDistribution, com_port=MUXD_COM),
+                'stirrer': ex.submit(StirrerController, port=STIRRER_COM),
+            }
+            devices = {name: fut.result() for name, fut in futures.items()}
+
+        ob = devices['ob']
+        mux = devices['mux']
+        muxd = devices['muxd']
+        stirrer = devices['stirrer']
+
         flow = FlowControl(ob, mux, muxd)
         
         # Initial Safe State
@@ -122,60 +188,125 @@ def main():
     
     # 3. Generate Plan
     df_plan = generate_experiment_plan()
-    logger.info(f"Generated plan with {len(df_plan)} reactions.")
+    logger.info("Generated plan with %d reactions.", len(df_plan))
     
     # 4. Data Directory Setup
     base_data_dir = Path("C:/data/arelling") / datetime.now().strftime("%Y-%m-%d")
     base_data_dir.mkdir(parents=True, exist_ok=True)
     
     # Save parameters
-    df_plan.to_csv(base_data_dir / "reaction_parameters.csv")
+    fast_write_csv(base_data_dir / "reaction_parameters.csv", df_plan)
+
+    # The plan is known up-front, so create every reaction folder in one
+    # batch here instead of paying a stat+mkdir round-trip per iteration
+    # (directory ops are expensive on Windows). Also fails fast if the
+    # data drive is unwritable.
+    rxn_dirs = {int(r.reaction_id): base_data_dir / f"{int(r.reaction_id):02d}_Ratio-{r.ratio}"
+                for r in df_plan.itertuples(index=False)}
+    for d in rxn_dirs.values():
+        d.mkdir(exist_ok=True)
     
     # 5. Main Loop
     stirrer.start_stirring(400)
     
     try:
-        for _, row in df_plan.iterrows():
-            rid = int(row['reaction_id'])
-            ratio = row['ratio']
+        # itertuples avoids boxing each row into a Series (iterrows)
+        for row in df_plan.itertuples(index=False):
+            rid = int(row.reaction_id)
+            ratio = row.ratio
             
-            logger.info(f"--- Starting Reaction {rid} (Ratio {ratio}) ---")
+            # %-style args defer string building until a handler accepts the record
+            logger.info("--- Starting Reaction %s (Ratio %s) ---", rid, ratio)
             
-            # Create Reaction Folder
-            rxn_dir = base_data_dir / f"{rid:02d}_Ratio-{ratio}"
-            rxn_dir.mkdir(exist_ok=True)
+            rxn_dir = rxn_dirs[rid]
             
             # --- Experiment Logic ---
             # 1. Pre-Cleaning / Flushing
             # 2. Injection
             logger.info("Injecting Precursors...")
-            flow.inject_volume('tol', row['toluene_volume'])
-            flow.inject_volume('ag', row['Ag_volume'])
-            flow.inject_volume('s', row['S_volume'])
+            flow.inject_volume('tol', row.toluene_volume)
+            flow.inject_volume('ag', row.Ag_volume)
+            flow.inject_volume('s', row.S_volume)
             
             # 3. Measurement Loop (Simplified)
+            # A producer thread samples the spectrometer on a fixed 1 Hz
+            # cadence (sleeping only the remainder of each period) while the
+            # main thread drains the queue into the preallocated buffer, so
+            # driver latency no longer stretches the sampling period.
+            duration = row.duration
+            max_samples = int(duration) + 1
+            intensities = np.empty((max_samples, N_PIXELS), dtype=np.float32)
+            sample_count = 0
+
+            spectra_q: queue.Queue = queue.Queue(maxsize=8)
+            stop_acquisition = threading.Event()
+
+            def _acquire():
+                while not stop_acquisition.is_set():
+                    t0 = time.perf_counter()
+                    try:
+                        # Trigger Spectrometer
+                        mux.set_trigger_out(True)
+                        spectrum = nir.get_formatted_spectrum()
+                        mux.set_trigger_out(False)
+                    except Exception as e:
+                        # Forward the failure to the consumer instead of
+                        # dying silently and leaving it to idle out the
+                        # full reaction duration on an empty queue.
+                        try:
+                            spectra_q.put_nowait(e)
+                        except queue.Full:
+                            pass  # consumer's is_alive() check catches it
+                        return
+                    # Downcast at the source: FP32 is ample for UV-Vis/NIR
+                    # counts and halves both queue and buffer footprint.
+                    spectra_q.put(spectrum.astype(np.float32, copy=False))
+                    time.sleep(max(0.0, 1.0 - (time.perf_counter() - t0))) # Frequency gate
+
+            producer = threading.Thread(target=_acquire, daemon=True)
+            producer.start()
             start_time = time.perf_counter()
-            duration = row['duration']
-            
-            intensities = []
-            
-            while (time.perf_counter() - start_time) < duration:
-                # Trigger Spectrometer
-                mux.set_trigger_out(True)
-                spec_data = nir.get_formatted_spectrum()
-                mux.set_trigger_out(False)
-                
-                intensities.append(spec_data)
-                time.sleep(1) # Frequency delay
-                
-                # Auto-Stop Logic could go here
-            
-            # 4. Save Data
-            pd.DataFrame(intensities).to_csv(rxn_dir / "spectra.csv")
-            logger.info(f"Reaction {rid} complete.")
+
+            try:
+                while (time.perf_counter() - start_time) < duration and sample_count < max_samples:
+                    try:
+                        item = spectra_q.get(timeout=1.0)
+                    except queue.Empty:
+                        if not producer.is_alive():
+                            raise RuntimeError("Acquisition thread died unexpectedly")
+                        continue
+                    if isinstance(item, Exception):
+                        raise RuntimeError("Spectrometer acquisition failed") from item
+                    intensities[sample_count] = item
+                    sample_count += 1
+
+                    # Auto-Stop Logic could go here
+            finally:
+                stop_acquisition.set()
+                producer.join(timeout=2.0)
+
+            # Overlap: start the distributor moving toward the waste port
+            # while the spectra are written out; motion takes seconds and
+            # collect_product then finds the valve already in place. Only
+            # issued with P2 vented, which it is after acquisition.
+            waste_move_issued = (ob.get_setpoint(2) == 0
+                                 and muxd.switch_valve_async(12, RotationMode.CW))
+
+            # 4. Save Data (truncate to the rows actually captured)
+            captured = intensities[:sample_count]
+            if pa is not None:
+                table = pa.Table.from_arrays(
+                    [pa.array(captured[:, i]) for i in range(N_PIXELS)],
+                    names=[f'w{i}' for i in range(N_PIXELS)])
+                pq.write_table(table, rxn_dir / "spectra.parquet", compression='zstd')
+            else:
+                np.savetxt(rxn_dir / "spectra.csv", captured, delimiter=',', fmt='%.5g')
+            logger.info("Reaction %s complete.", rid)
             
             # 5. Cleanup
             logger.info("Cleaning reactor...")
+            if waste_move_issued:
+                muxd.wait_for(12)
             flow.collect_product(12, 15) # Waste
             # Rinse
             for _ in range(2):
@@ -1,6 +1,6 @@
 import os
 import sys
-from ctypes import c_int32, c_uint16, c_double, c_char, CDLL
+from ctypes import c_int32, c_uint16, c_double, c_char, c_char_p, POINTER, CDLL
 from typing import Optional, Union, Any
 import logging
 
@@ -23,6 +23,56 @@ except ImportError:
     logger.critical(f"Could not import 'Elveflow64.py'. Ensure it is located in: {ELVEFLOW_DIR}")
     sys.exit(1)
 
+# --- C call signatures -------------------------------------------------------
+# Declared once at import: without argtypes/restype, ctypes re-infers the
+# argument conversions on every call, which is measurable when the drivers
+# poll at high rates. Declaring them also rejects wrong argument types at the
+# call site instead of corrupting the C stack.
+_P_INT32 = POINTER(c_int32)
+_P_DOUBLE = POINTER(c_double)
+
+_SDK_SIGNATURES = {
+    # OB1 Pressure Controller
+    'OB1_Initialization': [c_char_p, c_uint16, c_uint16, c_uint16, c_uint16, _P_INT32],
+    'OB1_Add_Sens': [c_int32, c_int32, c_uint16, c_uint16, c_uint16, c_uint16, c_double],
+    'OB1_Set_Filter': [c_int32, c_int32, c_double],
+    'OB1_Set_Press': [c_int32, c_int32, c_double],
+    'OB1_Set_Sens': [c_int32, c_int32, c_double],
+    'OB1_Get_All_Data': [c_int32] + [_P_DOUBLE] * 8,
+    'OB1_Calib': [c_int32],
+    'OB1_Calib_Load': [c_int32, c_char_p],
+    'OB1_Calib_Save': [c_int32, c_char_p],
+    'OB1_Set_Trig': [c_int32, c_int32],
+    'OB1_Get_Trig': [c_int32, _P_INT32],
+    'OB1_Reset_Instr': [c_int32],
+    'OB1_Destructor': [c_int32],
+    'PID_Add_Remote': [c_int32, c_int32, c_int32, c_int32, c_double, c_double, c_int32],
+    # MUX Wire
+    'MUX_Initialization': [c_char_p, _P_INT32],
+    'MUX_Set_valves_Type': [c_int32, c_int32, c_int32],
+    'MUX_Get_valves_Type': [c_int32, _P_INT32, c_int32],
+    'MUX_Wire_Set_all_valves': [c_int32, _P_INT32, c_int32],
+    'MUX_Set_indiv_valve': [c_int32, c_int32, c_int32, c_int32],
+    'MUX_Get_valves_state': [c_int32, _P_INT32, c_int32],
+    'MUX_Set_Trig': [c_int32, c_int32],
+    'MUX_Get_Trig': [c_int32, _P_INT32],
+    'MUX_Destructor': [c_int32],
+    # MUX Distribution
+    'MUX_DRI_Initialization': [c_char_p, _P_INT32],
+    'MUX_DRI_Get_Valve': [c_int32, _P_INT32],
+    'MUX_DRI_Set_Valve': [c_int32, c_int32, c_uint16],
+    'MUX_DRI_Send_Command': [c_int32, c_uint16, c_char_p, c_int32],
+    'MUX_DRI_Destructor': [c_int32],
+}
+
+for _name, _argtypes in _SDK_SIGNATURES.items():
+    _func = globals().get(_name)
+    # Only raw DLL entry points carry argtypes; skip anything the vendor
+    # wrapper exposes as a plain Python function.
+    if _func is not None and hasattr(_func, 'argtypes'):
+        _func.argtypes = _argtypes
+        _func.restype = c_int32
+
 
 class ElveflowCore:
     """
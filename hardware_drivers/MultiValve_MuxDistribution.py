@@ -1,9 +1,22 @@
 import time
 from ctypes import byref
-from typing import Optional
+from enum import IntEnum
+from typing import Optional, Union
 from Elveflow_Core import ElveflowCore, MUX_DRI_Initialization, \
     MUX_DRI_Get_Valve, MUX_DRI_Set_Valve, MUX_DRI_Send_Command, MUX_DRI_Destructor
 
+
+class RotationMode(IntEnum):
+    """Rotation strategy for MUX_DRI_Set_Valve (values match the SDK)."""
+    SHORT = 0  # Shortest path
+    CW = 1     # Clockwise
+    CCW = 2    # Counter-clockwise
+
+
+# Legacy string directions, compiled once at import
+_STR_MAP = {'short': RotationMode.SHORT, 'cw': RotationMode.CW, 'ccw': RotationMode.CCW}
+
+
 class MuxDistribution(ElveflowCore):
     """
     Driver for Elveflow MUX Distribution (12-port) or Recirculation (6-port) valves.
@@ -15,12 +28,16 @@ class MuxDistribution(ElveflowCore):
             com_port (str): Serial port (e.g., 'COM3' or 'ASRL1::INSTR').
         """
         super().__init__("MUX Distributor")
-        
-        print(f"Initializing {self.instrument_name} on {com_port}...")
+
+        # Last confirmed position; lets no-op switches skip the serial
+        # round-trip of get_valve(). -1 = unknown (forces a query).
+        self._last_pos = -1
+
+        self.logger.info("Initializing %s on %s...", self.instrument_name, com_port)
         error = MUX_DRI_Initialization(com_port.encode('ascii'), byref(self._instr_id))
-        
+
         if self._check_error(error, "Initialization"):
-            print(f"✅ {self.instrument_name} initialized. ID: {self._instr_id.value}")
+            self.logger.info("✅ %s initialized. ID: %d", self.instrument_name, self._instr_id.value)
         else:
             self._instr_id.value = -1
 
@@ -41,75 +58,116 @@ class MuxDistribution(ElveflowCore):
             return valve.value
         return -1
 
-    def switch_valve(self, valve_number: int, direction: str = "short", timeout: float = 20.0) -> None:
-        """
-        Blocking call to switch the valve to a target position.
-        
-        Args:
-            valve_number (int): Target position (1-12).
-            direction (str): 'short' (Shortest path), 'cw' (Clockwise), 'ccw' (Counter-Clockwise).
-            timeout (float): Max wait time in seconds.
-        """
-        if self._instr_id.value < 0: return
+    def _issue_switch(self, valve_number: int,
+                      direction: Union[RotationMode, str]) -> bool:
+        """Sends the move command without waiting. Returns True if accepted."""
+        self.logger.debug("Switching to valve %d (%s)...", valve_number, direction)
 
-        current = self.get_valve()
-        if current == valve_number:
-            return
+        if isinstance(direction, RotationMode):
+            rotation_mode = direction
+        else:
+            rotation_mode = _STR_MAP.get(direction.lower(), RotationMode.SHORT)
 
-        # print(f"Switching to valve {valve_number} ({direction})...")
-        
-        # SDK Mapping: 0 = shortest, 1 = clockwise, 2 = counter-clockwise
-        mode_map = {'short': 0, 'cw': 1, 'ccw': 2}
-        rotation_mode = mode_map.get(direction.lower(), 0)
-        
         error = MUX_DRI_Set_Valve(
-            self._instr_id.value, 
-            self.C_INT32(valve_number), 
+            self._instr_id.value,
+            self.C_INT32(valve_number),
             self.C_UINT16(rotation_mode)
         )
-        
-        if not self._check_error(error, "Set Valve"):
-            return
+        return self._check_error(error, "Set Valve")
+
+    def wait_for(self, valve_number: int, timeout: float = 20.0) -> bool:
+        """
+        Polls until the valve reports the target position.
+
+        Returns:
+            bool: True if the position was reached within timeout.
+        """
+        if self._instr_id.value < 0: return False
+        if self._last_pos == valve_number: return True
 
-        # Polling loop
-        start_t = time.time()
-        while (time.time() - start_t) < timeout:
-            time.sleep(0.2)
+        # Polling loop: short paths finish in well under 200ms, so start
+        # fast and back off exponentially toward the old 0.2s cadence.
+        # monotonic_ns is immune to NTP/DST wall-clock jumps.
+        deadline_ns = time.monotonic_ns() + int(timeout * 1e9)
+        poll_delay = 0.02
+        while time.monotonic_ns() < deadline_ns:
             state = self.get_valve()
             if state == valve_number:
-                print(f"✅ Reached valve {valve_number}")
-                return
-            
-        print(f"❌ Timeout switching to valve {valve_number}")
+                self._last_pos = valve_number
+                # debug: per-switch confirmations are too chatty for a run log
+                self.logger.debug("✅ Reached valve %d", valve_number)
+                return True
+            time.sleep(poll_delay)
+            poll_delay = min(poll_delay * 1.5, 0.2)
+
+        self._last_pos = -1
+        self.logger.error("❌ Timeout switching to valve %d", valve_number)
+        return False
+
+    def switch_valve_async(self, valve_number: int,
+                           direction: Union[RotationMode, str] = RotationMode.SHORT) -> bool:
+        """
+        Starts a valve move and returns immediately; motion takes seconds,
+        so the caller can do independent work and wait_for() the position
+        later.
+
+        Returns:
+            bool: True if a move was issued (i.e. wait_for() is required).
+        """
+        if self._instr_id.value < 0: return False
+
+        if self._last_pos == valve_number or self.get_valve() == valve_number:
+            self._last_pos = valve_number
+            return False
+
+        self._last_pos = -1 # In motion; position unknown until confirmed
+        return self._issue_switch(valve_number, direction)
+
+    def switch_valve(self, valve_number: int,
+                     direction: Union[RotationMode, str] = RotationMode.SHORT,
+                     timeout: float = 20.0) -> None:
+        """
+        Blocking call to switch the valve to a target position.
+
+        Args:
+            valve_number (int): Target position (1-12).
+            direction: RotationMode member; legacy strings 'short'/'cw'/'ccw'
+                are still accepted.
+            timeout (float): Max wait time in seconds.
+        """
+        if self.switch_valve_async(valve_number, direction):
+            self.wait_for(valve_number, timeout)
 
     def home(self, timeout: float = 20.0) -> None:
         """
         Performs the homing sequence to calibrate position 1.
         """
         if self._instr_id.value < 0: return
-        
-        print("🔄 Homing valve...")
+
+        self.logger.info("🔄 Homing valve...")
+        self._last_pos = -1 # Position unknown while the motor homes
         ans = self.C_CHAR_40()
-        
+
         # Command 0 = Home
         error = MUX_DRI_Send_Command(self._instr_id.value, self.C_UINT16(0), ans, 40)
-        
+
         if self._check_error(error, "Homing"):
-            print("Home command sent. Waiting for completion...")
-            time.sleep(0.5) 
-            
-            start_t = time.time()
-            while (time.time() - start_t) < timeout:
+            self.logger.debug("Home command sent. Waiting for completion...")
+
+            deadline_ns = time.monotonic_ns() + int(timeout * 1e9)
+            poll_delay = 0.05
+            while time.monotonic_ns() < deadline_ns:
+                time.sleep(poll_delay)
+                poll_delay = min(poll_delay * 1.5, 0.5)
                 state = self.get_valve()
-                
+
                 # State 0 = Busy/Moving. State > 0 = Stopped at a valid position.
                 if state > 0:
-                    print(f"✅ Homing complete. Reached position {state}.")
+                    self._last_pos = state
+                    self.logger.info("✅ Homing complete. Reached position %d.", state)
                     return
-                    
-                time.sleep(0.5)
-                
-            print("❌ Homing timed out.")
+
+            self.logger.error("❌ Homing timed out.")
 
     def get_serial(self) -> Optional[str]:
         """Queries the hardware serial number."""
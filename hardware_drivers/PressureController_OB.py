@@ -1,5 +1,7 @@
-from ctypes import byref
-from typing import Dict, Tuple, Optional
+import time
+from ctypes import POINTER, byref, cast, sizeof
+from typing import Dict, Tuple, Optional, Union
+import numpy as np
 from Elveflow_Core import ElveflowCore, OB1_Initialization, OB1_Add_Sens, \
     OB1_Set_Filter, OB1_Set_Press, OB1_Set_Sens, OB1_Get_All_Data, \
     OB1_Calib_Load, OB1_Calib, OB1_Calib_Save, OB1_Set_Trig, OB1_Get_Trig, \
@@ -26,8 +28,29 @@ class PressureController(ElveflowCore):
         """
         super().__init__("OB1")
         
-        # Internal Memory for Setpoints to minimize unnecessary hardware calls
-        self._setpoints: Dict[int, float] = {ch: 0.0 for ch in range(1, 5)} 
+        # Internal Memory for Setpoints to minimize unnecessary hardware calls.
+        # Flat array indexed by channel (slot 0 unused): no hashing on the
+        # per-tick get/set path. NaN-seeded so the first write to a channel
+        # never compares equal and always reaches the hardware — a zero seed
+        # silently dropped the initial safe-state vents (set_pressure(ch, 0)).
+        self._setpoints = np.full(5, np.nan, dtype=np.float64)
+
+        # Reusable read buffer for get_data(): 8 doubles (4x Pressure, 4x Sensor)
+        # plus pointers into it, so polling does not allocate per call.
+        self._data_buf = (self.C_DOUBLE * 8)()
+        # cast() rather than bare byref(): the SDK declares POINTER(c_double)
+        # argtypes, which reject the CArgObject that an offset byref yields.
+        self._data_ptrs = [cast(byref(self._data_buf, i * sizeof(self.C_DOUBLE)),
+                                POINTER(self.C_DOUBLE)) for i in range(8)]
+        # Zero-copy (4, 2) view onto the buffer: row = channel-1, cols = (P, Flow).
+        # The SDK writes straight into it, so no per-sample allocation at all.
+        self._data_view = np.frombuffer(self._data_buf, dtype=np.float64).reshape(4, 2)
+        self._last_read_t = 0.0
+        self._have_data = False
+
+        # Last written sensor targets / trigger state, to skip no-op DLL calls
+        self._sens_targets: Dict[int, float] = {}
+        self._last_trig: Optional[int] = None
         
         print(f"Initializing {self.instrument_name} ({device_name_or_serial})...")
         
@@ -113,7 +136,11 @@ class PressureController(ElveflowCore):
     def set_pressure(self, channel: int, mbar: float) -> None:
         """Sets pressure in mbar and updates internal state."""
         if self._instr_id.value < 0: return
-        
+
+        # Control loops often repeat the same target every tick; skip the bus
+        if self._setpoints[channel] == mbar:
+            return
+
         error = OB1_Set_Press(self._instr_id.value, self.C_INT32(channel), self.C_DOUBLE(mbar))
         
         if self._check_error(error, f"Set Pressure Ch{channel}"):
@@ -122,40 +149,61 @@ class PressureController(ElveflowCore):
     def set_target(self, channel: int, value: float) -> None:
         """Sets target for Flow Control (if PID is active) or Pressure."""
         if self._instr_id.value < 0: return
-        
+
+        if self._sens_targets.get(channel) == value:
+            return
+
         error = OB1_Set_Sens(self._instr_id.value, self.C_INT32(channel), self.C_DOUBLE(value))
-        self._check_error(error, f"Set Target Ch{channel} -> {value}")
+        if self._check_error(error, f"Set Target Ch{channel} -> {value}"):
+            self._sens_targets[channel] = value
 
     def get_setpoint(self, channel: int) -> float:
-        """Returns the last known setpoint (cached) to avoid bus traffic."""
-        return self._setpoints.get(channel, 0.0)
+        """Returns the last known setpoint (cached) to avoid bus traffic,
+        or NaN if the channel has never been written."""
+        return float(self._setpoints[channel])
 
-    def get_data(self) -> Optional[Dict[int, Tuple[float, float]]]:
+    def get_data(self, max_age: float = 0.01,
+                 as_dict: bool = False) -> Optional[Union[np.ndarray, Dict[int, Tuple[float, float]]]]:
         """
         Reads all channels synchronously.
-        
+
+        Args:
+            max_age (float): Readings younger than this (seconds) are served
+                from cache, so multiple observers in the same control tick
+                share one SDK round-trip. Pass 0 to force a fresh read.
+            as_dict (bool): Legacy output format (allocates per call).
+
         Returns:
-            dict: {Channel_ID: (Pressure, Flow)} or None if error.
+            ndarray: (4, 2) array; row = channel-1, columns = (Pressure, Flow).
+                This is a view onto the driver's read buffer — copy it if you
+                need the values to survive the next read. With as_dict=True,
+                a {Channel_ID: (Pressure, Flow)} dict instead.
+            None on error.
         """
         if self._instr_id.value < 0: return None
-        
-        data = [self.C_DOUBLE() for _ in range(8)]
-        
-        # Pointers to 8 doubles (4x Pressure, 4x Sensor)
-        error = OB1_Get_All_Data(self._instr_id.value, 
-                                 byref(data[0]), byref(data[1]),
-                                 byref(data[2]), byref(data[3]),
-                                 byref(data[4]), byref(data[5]),
-                                 byref(data[6]), byref(data[7]))
-        
-        if self._check_error(error, "Get Data"):
-            return {
-                1: (data[0].value, data[1].value),
-                2: (data[2].value, data[3].value),
-                3: (data[4].value, data[5].value),
-                4: (data[6].value, data[7].value),
-            }
-        return None
+
+        now = time.perf_counter()
+        if not (self._have_data and (now - self._last_read_t) < max_age):
+            error = OB1_Get_All_Data(self._instr_id.value, *self._data_ptrs)
+            if not self._check_error(error, "Get Data"):
+                return None
+            self._last_read_t = now
+            self._have_data = True
+
+        if as_dict:
+            buf = self._data_buf
+            return {ch: (buf[2 * ch - 2], buf[2 * ch - 1]) for ch in range(1, 5)}
+        return self._data_view
+
+    def get_pressures(self, max_age: float = 0.01) -> Optional[np.ndarray]:
+        """Zero-copy view of the four regulator pressures (mbar)."""
+        data = self.get_data(max_age)
+        return None if data is None else data[:, 0]
+
+    def get_flows(self, max_age: float = 0.01) -> Optional[np.ndarray]:
+        """Zero-copy view of the four flow-sensor readings."""
+        data = self.get_data(max_age)
+        return None if data is None else data[:, 1]
 
     def calibrate(self, path: str, load_existing: bool = True) -> None:
         """
@@ -204,8 +252,11 @@ class PressureController(ElveflowCore):
         """Sets the digital trigger output (0V / 5V)."""
         if self._instr_id.value < 0: return
         val = 1 if state else 0
-        error = OB1_Set_Trig(self._instr_id.value, self.C_INT32(val)) 
-        self._check_error(error, "Set Trig Out")
+        if val == self._last_trig:
+            return
+        error = OB1_Set_Trig(self._instr_id.value, self.C_INT32(val))
+        if self._check_error(error, "Set Trig Out"):
+            self._last_trig = val
 
     def get_trigger_in(self) -> Optional[bool]:
         """Reads the digital trigger input."""
@@ -223,6 +274,14 @@ class PressureController(ElveflowCore):
         if self._instr_id.value >= 0:
             print("⚠️ Resetting OB1...")
             OB1_Reset_Instr(self._instr_id.value)
+            # The instrument reverts to its power-on state (0 mbar, trigger
+            # low), so the skip-on-equal caches no longer match hardware.
+            # Drop them, or re-commanding the last cached value would be
+            # silently skipped.
+            self._setpoints.fill(np.nan)
+            self._sens_targets.clear()
+            self._last_trig = None
+            self._have_data = False
 
     def close(self) -> None:
         """Releases the instrument handle."""
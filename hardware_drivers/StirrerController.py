@@ -1,6 +1,9 @@
+import os
 import serial
+import struct
 import time
 import logging
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Tuple, Optional, List, Union
 
 # Configure logging
@@ -10,25 +13,50 @@ class StirrerController:
     """
     Driver for LLG uniSTIRRER 5 (Binary Protocol).
     
-    Handles low-level binary communication (Hex-based) to control 
+    Handles low-level binary communication (Hex-based) to control
     stirring speed (RPM) and hotplate temperature.
     """
 
-    def __init__(self, port: str = 'COM8', baudrate: int = 9600, timeout: float = 2.0):
+    # Constant query frames [Prefix][Opcode][3x 0x00][Checksum] — these
+    # never vary, so they are built once at class definition.
+    _PKT_HELLO = bytes([0xFE, 0xA0, 0x00, 0x00, 0x00, 0xA0])
+    _PKT_INFO = bytes([0xFE, 0xA1, 0x00, 0x00, 0x00, 0xA1])
+    _PKT_STA = bytes([0xFE, 0xA2, 0x00, 0x00, 0x00, 0xA2])
+
+    def __init__(self, port: str = 'COM8', baudrate: int = 9600, timeout: float = 0.2):
         """
         Initialize the Stirrer Controller.
 
         Args:
             port (str): The COM port (e.g., 'COM8' or '/dev/ttyUSB0').
             baudrate (int): Connection speed (default: 9600).
-            timeout (float): Read timeout in seconds.
+            timeout (float): Per-command response deadline in seconds. The
+                6-15 byte responses arrive in a few ms at 9600 baud, so a
+                short deadline keeps failure paths snappy.
         """
         self.port = port
         self.baudrate = baudrate
         self.timeout = timeout
         self.ser: Optional[serial.Serial] = None
+        # Reusable 6-byte TX frame; the protocol always sends
+        # [Prefix][Instruction][3x Data][Checksum]
+        self._tx = bytearray(6)
+        # Last commanded values: repeated set calls skip the info/sta
+        # polls and the set round-trip entirely. None = unknown.
+        self._last_speed: Optional[int] = None
+        self._last_temp: Optional[int] = None # protocol units (0.1 °C)
+        # Single worker for the *_async variants: serial exchanges stay
+        # strictly ordered while the caller overlaps other hardware.
+        self._exec = ThreadPoolExecutor(max_workers=1,
+                                        thread_name_prefix="stirrer")
         self._connect()
 
+    def refresh_state(self) -> None:
+        """Clears the cached speed/temperature, forcing a full re-sync on
+        the next set call (e.g. after a manual front-panel change)."""
+        self._last_speed = None
+        self._last_temp = None
+
     def _connect(self) -> None:
         """Internal method to establish the serial connection."""
         try:
@@ -40,89 +68,138 @@ class StirrerController:
                 bytesize=serial.EIGHTBITS,
                 timeout=self.timeout
             )
+            self._tune_bridge_latency()
             logger.info(f"Stirrer connected on {self.port}")
         except serial.SerialException as e:
             logger.error(f"Failed to connect stirrer on {self.port}: {e}")
             raise e
 
+    def _tune_bridge_latency(self) -> None:
+        """
+        Best-effort tuning of the USB-serial bridge. FTDI bridges hold RX
+        bytes for up to 16 ms (default latency timer) before surfacing them,
+        which delays every response; drop the timer to 1 ms and enlarge the
+        buffers where the platform supports it. All steps are optional.
+        """
+        if hasattr(self.ser, 'set_buffer_size'):
+            try:
+                self.ser.set_buffer_size(rx_size=4096, tx_size=1024)
+            except (OSError, serial.SerialException):
+                pass
+
+        try:
+            if hasattr(self.ser, 'latency_timer'):
+                self.ser.latency_timer = 1
+                logger.debug("Bridge latency timer set to 1 ms")
+            else:
+                # Linux exposes the FTDI knob via sysfs
+                tty = os.path.basename(self.port)
+                sysfs = f"/sys/bus/usb-serial/devices/{tty}/latency_timer"
+                with open(sysfs, 'w') as f:
+                    f.write('1')
+                logger.debug("Bridge latency timer set to 1 ms via sysfs")
+        except (OSError, serial.SerialException):
+            logger.debug("Could not lower bridge latency timer; using driver default")
+
     def close(self) -> None:
         """Closes the serial connection safely, stopping hardware first."""
+        self._exec.shutdown(wait=True) # Let pending deferred commands land
         if self.ser and self.ser.is_open:
             try:
-                # Try to stop stirring/heating before disconnect (Safety)
-                self.stop_stirring()
-                self.stop_heating()
+                # Stop stirring/heating before disconnect (Safety).
+                # Issue the wire commands directly: the high-level stop
+                # helpers would add status polls that only matter mid-run.
+                self.set_speed(0)
+                self.set_temp(250) # 25.0°C safe idle
             except Exception as e:
                 logger.warning(f"Error during safe shutdown: {e}")
-            
+
+            self.refresh_state()
             self.ser.close()
             logger.info(f"Stirrer connection on {self.port} closed.")
 
     # --- 1. Protocol Helpers ---
 
-    def _calculate_checksum(self, instruction_code: int, data_frames: List[int]) -> int:
-        """Calculates the 8-bit checksum required by the device protocol."""
-        checksum = instruction_code
-        for frame in data_frames:
-            checksum = (checksum + frame) & 0xFF
-        return checksum
-
-    def _get_high_low_bytes(self, number: int) -> Tuple[int, int]:
-        """Splits a 16-bit integer into (High Byte, Low Byte)."""
-        return (number >> 8) & 0xFF, number & 0xFF
+    def _read_exactly(self, n: int, deadline: float) -> bytes:
+        """
+        Accumulates exactly n bytes, returning whatever arrived once the
+        deadline passes. Unlike a single ser.read after a fixed sleep, this
+        returns as soon as the device has answered (a few ms at 9600 baud).
 
-    def _combine_bytes(self, high_byte: Union[bytes, int], low_byte: Union[bytes, int]) -> int:
-        """Combines High and Low bytes back into a 16-bit integer."""
-        h = high_byte[0] if isinstance(high_byte, bytes) else high_byte
-        l = low_byte[0] if isinstance(low_byte, bytes) else low_byte
-        return (h << 8) | l
+        Each pass requests the full remaining length, so a complete response
+        costs one read call. Deliberately not wrapped in io.BufferedReader:
+        its read-ahead would ask pyserial for a whole buffer's worth and
+        block for the full timeout on these short fixed-length replies.
+        OS-level buffering is handled in _tune_bridge_latency instead.
+        """
+        read = self.ser.read
+        buf = bytearray()
+        while len(buf) < n and time.monotonic() < deadline:
+            chunk = read(n - len(buf))
+            if chunk:
+                buf.extend(chunk)
+        return bytes(buf)
 
-    def _send_command(self, instruction_code: int, data_frames: List[int], response_length: int) -> Optional[bytes]:
+    def _send_raw(self, packet: Union[bytes, bytearray], response_length: int) -> Optional[bytes]:
         """
-        Sends a binary command packet and validates the response.
-        
-        Packet Structure: [Prefix (0xFE)] [Instruction] [Data...] [Checksum]
+        Writes a prebuilt packet verbatim and validates the response.
         """
         if not self.ser or not self.ser.is_open:
             logger.error("Attempted command on closed connection.")
             return None
 
-        # 1. Clear Buffer to ensure fresh response
-        self.ser.reset_input_buffer()
-
-        # 2. Construct Packet
-        prefix = 0xFE
-        checksum = self._calculate_checksum(instruction_code, data_frames)
-        packet = [prefix, instruction_code] + data_frames + [checksum]
-        
-        # 3. Send
         try:
-            self.ser.write(bytes(packet))
-            time.sleep(0.1) # Wait for hardware processing
-            
-            # 4. Read Response
-            response = self.ser.read(response_length)
+            # 1. Clear Buffer to ensure fresh response. reset_input_buffer()
+            # costs a kernel purge ioctl every command; after a clean exchange
+            # the buffer is already empty, so only drain leftovers if present.
+            if self.ser.in_waiting:
+                self.ser.read(self.ser.in_waiting)
+
+            # 2. Send
+            self.ser.write(packet)
+
+            # 3. Read Response (deadline-bounded; no fixed processing sleep)
+            deadline = time.monotonic() + self.timeout
+            response = self._read_exactly(response_length, deadline)
             if len(response) < response_length:
-                logger.warning(f"Command 0x{instruction_code:02X} timed out (received {len(response)}/{response_length} bytes)")
+                logger.warning(f"Command 0x{packet[1]:02X} timed out (received {len(response)}/{response_length} bytes)")
                 return None
 
-            # 5. Validate Prefix (0xFD is standard response prefix)
+            # 4. Validate Prefix (0xFD is standard response prefix)
             if response[0] != 0xFD:
                 logger.warning(f"Invalid Response Prefix: {hex(response[0])}")
                 return None
-                
+
             # Return data payload (strip prefix, echo, checksum)
             return response[2:-1]
-            
+
         except serial.SerialException as e:
             logger.error(f"Serial communication error: {e}")
             return None
 
+    def _send_command(self, instruction_code: int, data_frames: List[int], response_length: int) -> Optional[bytes]:
+        """
+        Sends a binary command packet and validates the response.
+
+        Packet Structure: [Prefix (0xFE)] [Instruction] [Data...] [Checksum]
+        """
+        # Construct Packet in the reusable TX frame (no per-command
+        # list/bytes allocation; checksum inlined to skip a helper call)
+        if len(data_frames) != 3:
+            raise ValueError("Protocol packets carry exactly 3 data frames")
+        buf = self._tx
+        buf[0] = 0xFE
+        buf[1] = instruction_code
+        buf[2], buf[3], buf[4] = data_frames
+        buf[5] = (instruction_code + buf[2] + buf[3] + buf[4]) & 0xFF
+
+        return self._send_raw(buf, response_length)
+
     # --- 2. Core Commands ---
 
     def cmd_hello(self) -> int:
         """Handshake command (0xA0). Returns 1 if successful."""
-        resp = self._send_command(0xA0, [0x00, 0x00, 0x00], 6)
+        resp = self._send_raw(self._PKT_HELLO, 6)
         return 1 if (resp and resp[0] == 0x00) else 0
 
     def cmd_info(self) -> Tuple[int, int]:
@@ -130,7 +207,7 @@ class StirrerController:
         Queries status (0xA1).
         Returns: (stirrer_active (0/1), heater_active (0/1))
         """
-        resp = self._send_command(0xA1, [0x00, 0x00, 0x00], 12)
+        resp = self._send_raw(self._PKT_INFO, 12)
         if not resp: 
             return -1, -1
         
@@ -144,83 +221,125 @@ class StirrerController:
         Queries current values (0xA2).
         Returns: (Set Speed, Real Speed, Set Temp, Real Temp)
         """
-        resp = self._send_command(0xA2, [0x00, 0x00, 0x00], 15)
+        resp = self._send_raw(self._PKT_STA, 15)
         if not resp or len(resp) < 8:
             return 0, 0, 0.0, 0.0
-            
-        speed_set = self._combine_bytes(resp[0], resp[1])
-        real_speed = self._combine_bytes(resp[2], resp[3])
+
+        # One C-level unpack for the four big-endian words
+        speed_set, real_speed, temp_set_raw, real_temp_raw = struct.unpack_from('>HHHH', resp, 0)
         # Temperature is scaled by 10 (e.g., 255 = 25.5°C)
-        temp_set = self._combine_bytes(resp[4], resp[5]) / 10.0 
-        real_temp = self._combine_bytes(resp[6], resp[7]) / 10.0
-        
-        return speed_set, real_speed, temp_set, real_temp
+        return speed_set, real_speed, temp_set_raw * 0.1, real_temp_raw * 0.1
 
     def set_speed(self, speed: int) -> bool:
         """Sets target RPM (Command 0xB1)."""
-        h, l = self._get_high_low_bytes(speed)
-        resp = self._send_command(0xB1, [h, l, 0x00], 6)
+        resp = self._send_command(0xB1, [(speed >> 8) & 0xFF, speed & 0xFF, 0x00], 6)
         return bool(resp and resp[0] == 0x00)
 
     def set_temp(self, temp_int: int) -> bool:
         """Sets internal temperature integer value (Command 0xB2)."""
-        h, l = self._get_high_low_bytes(temp_int)
-        resp = self._send_command(0xB2, [h, l, 0x00], 6)
+        resp = self._send_command(0xB2, [(temp_int >> 8) & 0xFF, temp_int & 0xFF, 0x00], 6)
         return bool(resp and resp[0] == 0x00)
 
     # --- 3. High Level Control ---
 
+    def _wait_device_off(self, index: int, deadline_s: float = 0.5) -> None:
+        """
+        Polls cmd_info until the selected flag (0 = stirrer, 1 = heater)
+        reads off, giving up after deadline_s. Replaces the blind 0.5s
+        settle sleep: the device usually reports off within ~10ms.
+        """
+        deadline = time.monotonic() + deadline_s
+        while time.monotonic() < deadline:
+            if self.cmd_info()[index] == 0:
+                return
+            time.sleep(0.01)
+
     def start_stirring(self, speed: int = 300) -> None:
         """
-        Starts stirring at the specified RPM. 
+        Starts stirring at the specified RPM.
         Includes check to prevent unnecessary commands if already running.
         """
+        # Already commanded to this speed: skip the info/sta polls too
+        if self._last_speed == speed:
+            return
+
         current_status, _ = self.cmd_info()
-        
+
         # If already on but speed differs, restart logic (device specific quirk)
         if current_status == 1:
             curr_set, _, _, _ = self.cmd_sta()
             if curr_set != speed:
                 self.stop_stirring()
-                time.sleep(0.5)
-        
+                self._wait_device_off(0)
+
         if self.set_speed(speed):
+            self._last_speed = speed
             logger.info(f"Stirring set to {speed} RPM")
         else:
+            self._last_speed = None
             logger.error("Failed to set stirring speed")
 
     def stop_stirring(self) -> None:
         """Stops the stirrer (Sets RPM to 0)."""
         if self.set_speed(0):
+            self._last_speed = 0
             logger.info("Stirring Stopped")
+        else:
+            self._last_speed = None
 
     def set_temperature(self, temp_c: float) -> None:
         """
         Sets target temperature in °C.
         """
         temp_val = int(temp_c * 10) # Convert 25.5 -> 255 for protocol
-        
+
+        if self._last_temp == temp_val:
+            return
+
         _, current_heat = self.cmd_info()
         if current_heat == 1:
             _, _, curr_set, _ = self.cmd_sta()
             # If target changed significantly, reset heating logic
             if abs(curr_set - temp_c) > 0.1:
                 self.stop_heating()
-                time.sleep(0.5)
+                self._wait_device_off(1)
 
         if self.set_temp(temp_val):
+            self._last_temp = temp_val
             logger.info(f"Temperature set to {temp_c}°C")
         else:
+            self._last_temp = None
             logger.error("Failed to set temperature")
 
     def start_heating(self, temp_c: float) -> None:
         """Alias for set_temperature."""
         self.set_temperature(temp_c)
 
+    # --- Deferred variants ---
+    # The serial exchange blocks the calling thread (up to 0.5s when a
+    # restart settle is involved); these submit the synchronous method to
+    # the single worker and return a Future, so independent hardware can be
+    # commanded in the meantime. Don't interleave direct sync calls while a
+    # submitted one is pending — the worker is the serializer.
+
+    def _send_command_async(self, instruction_code: int, data_frames: List[int],
+                            response_length: int) -> Future:
+        return self._exec.submit(self._send_command, instruction_code,
+                                 data_frames, response_length)
+
+    def start_stirring_async(self, speed: int = 300) -> Future:
+        return self._exec.submit(self.start_stirring, speed)
+
+    def set_temperature_async(self, temp_c: float) -> Future:
+        return self._exec.submit(self.set_temperature, temp_c)
+
     def stop_heating(self) -> None:
         """Sets temperature to a safe idle value (25°C)."""
         if self.set_temp(250): # 25.0°C
+            self._last_temp = 250
             logger.info("Heating Stopped (Target: 25°C)")
+        else:
+            self._last_temp = None
 
     # --- Context Manager Support ---
     def __enter__(self): 
@@ -1,18 +1,47 @@
-from ctypes import byref, create_string_buffer
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from ctypes import byref, create_string_buffer, memmove, memset, sizeof
 from Elveflow_Core import *
 
+# Module-level alias: hot methods call this constantly, and a module-global
+# lookup is cheaper than re-resolving the wildcard-imported name each time.
+_MUX_SET_ALL = MUX_Wire_Set_all_valves
+
+
 class MuxWire(ElveflowCore):
     """
     Manages the Elveflow MUX Wire (16 individual valves).
     """
     MAX_VALVES = 16
+    STATE_TTL = 0.05  # seconds a readback stays fresh; valves don't move on their own
 
     def __init__(self, device_name="Dev1"):
         # MUX Wire uses NI-DAQ naming (e.g. "Dev1")
         super().__init__("MUX Wire")
-        
+
         self._valve_states = (self.C_INT32 * self.MAX_VALVES)(0)
 
+        # Batching: inside batch(), state changes only mutate the array and
+        # a single SDK write is issued on exit (dirty-bit coalescing)
+        self._batching = False
+        self._dirty = False
+
+        # Short-TTL readback cache so loops that poll several valves share
+        # one bulk DAQ read. Invalidated by every write.
+        self._state_cache = None
+        self._state_cache_time = 0.0
+
+        # Reusable scratch arrays for SDK readbacks; the SDK overwrites all
+        # 16 entries, so no per-call allocation or zeroing is needed.
+        self._types_scratch = (self.C_INT32 * self.MAX_VALVES)()
+        self._state_scratch = (self.C_INT32 * self.MAX_VALVES)()
+
+        # Single worker for the *_async variants: one thread serializes all
+        # deferred SDK calls so the DAQ never sees concurrent commands.
+        self._exec = ThreadPoolExecutor(max_workers=1,
+                                        thread_name_prefix="muxwire")
+
         c_name = create_string_buffer(device_name.encode('ascii'))
         print(f"Initializing {self.instrument_name} on {device_name}...")
         
@@ -24,6 +53,52 @@ class MuxWire(ElveflowCore):
         else:
             self._instr_id.value = -1
 
+    # --- Deferred variants ---
+    # Each MUX_* SDK call blocks for a full DAQ round-trip; these submit the
+    # synchronous method to the single worker and return a Future, letting
+    # the caller command independent hardware (e.g. the stirrer) in the
+    # meantime and .result() later. Don't interleave direct sync calls while
+    # a submitted one is still pending — the worker is the serializer.
+
+    def toggle_async(self, valve_idx: int, open_valve: bool) -> Future:
+        return self._exec.submit(self.toggle, valve_idx, open_valve)
+
+    def set_all_async(self, states: list) -> Future:
+        return self._exec.submit(self.set_all, states)
+
+    def set_individual_valve_async(self, valve_idx: int, state: bool) -> Future:
+        return self._exec.submit(self.set_individual_valve, valve_idx, state)
+
+    def set_trigger_out_async(self, high: bool) -> Future:
+        return self._exec.submit(self.set_trigger_out, high)
+
+    @contextmanager
+    def batch(self):
+        """
+        Coalesces valve changes: toggles inside the block mutate the cached
+        state array and the hardware sees one MUX_Wire_Set_all_valves call
+        on exit instead of one per toggle.
+
+        Usage:
+            with mux.batch():
+                mux.toggle(1, True)
+                mux.toggle(3, True)
+        """
+        self._batching = True
+        try:
+            yield self
+        finally:
+            self._batching = False
+            if self._dirty:
+                self._flush()
+
+    def _flush(self):
+        """Writes the cached state array to the hardware."""
+        self._state_cache = None
+        error = _MUX_SET_ALL(self._instr_id.value, self._valve_states, 16)
+        if self._check_error(error, "Set All Valves (flush)"):
+            self._dirty = False
+
     def configure_valve_type(self, valve_idx: int, valve_type: int):
         """Configures valve type (SDK: MUX_Set_valves_Type)."""
         if self._instr_id.value < 0: return
@@ -39,9 +114,8 @@ class MuxWire(ElveflowCore):
         """Reads valve type (SDK: MUX_Get_valves_Type)."""
         if self._instr_id.value < 0: return None
         
-        # Array to hold types (SDK requirement)
-        types_array = (self.C_INT32 * 16)(0)
-        
+        types_array = self._types_scratch
+
         # Note: SDK takes len=16, implies it fills the array
         error = MUX_Get_valves_Type(self._instr_id.value, types_array, 16)
         
@@ -57,25 +131,108 @@ class MuxWire(ElveflowCore):
             print("❌ Need exactly 16 states.")
             return
 
+        # Plain int assignment uses ctypes' int-to-slot fast path; wrapping
+        # each value in C_INT32 built 16 throwaway objects per call.
+        buf = self._valve_states
         for i, val in enumerate(states):
-            self._valve_states[i] = self.C_INT32(val)
-            
-        error = MUX_Wire_Set_all_valves(self._instr_id.value, self._valve_states, 16)
+            buf[i] = val
+
+        if self._batching:
+            self._dirty = True
+            return
+
+        self._state_cache = None
+        error = _MUX_SET_ALL(self._instr_id.value, buf, 16)
         self._check_error(error, "Set All Valves")
 
+    def set_all_from_buffer(self, buf):
+        """
+        Sets all 16 valves from a contiguous int32 buffer — a length-16
+        numpy int32 array or array.array('i') — copying the 64 bytes with
+        one memmove instead of Python-level iteration. Suited to schedule
+        playback where the states are precomputed in bulk.
+
+        Raises:
+            ValueError: if buf is not a contiguous length-16 buffer of
+                4-byte integers (e.g. int64 arrays, which memmove would
+                silently truncate, or short buffers, which it would
+                overread).
+        """
+        if self._instr_id.value < 0: return
+
+        if hasattr(buf, 'ctypes'):  # numpy ndarray
+            if (buf.dtype.kind not in 'iu' or buf.dtype.itemsize != 4
+                    or buf.size != self.MAX_VALVES
+                    or not buf.flags['C_CONTIGUOUS']):
+                raise ValueError(
+                    f"Expected a C-contiguous int32 array of "
+                    f"{self.MAX_VALVES} states, got {buf.dtype} x {buf.size}")
+            src = buf.ctypes.data
+        else:                       # array.array
+            if buf.itemsize != 4 or len(buf) != self.MAX_VALVES:
+                raise ValueError(
+                    f"Expected array.array('i') of {self.MAX_VALVES} states, "
+                    f"got '{buf.typecode}' x {len(buf)}")
+            src = buf.buffer_info()[0]
+        memmove(self._valve_states, src, sizeof(self._valve_states))
+
+        if self._batching:
+            self._dirty = True
+            return
+
+        self._state_cache = None
+        error = _MUX_SET_ALL(self._instr_id.value, self._valve_states, 16)
+        self._check_error(error, "Set All Valves (buffer)")
+
+    def set_all_mask(self, mask: int):
+        """
+        Sets all 16 valves from the low 16 bits of an int (bit i = valve i+1).
+        Skips the list build/traversal of set_all for callers that keep
+        manifold state as a bitmask.
+        """
+        iid = self._instr_id.value
+        if iid < 0: return
+
+        buf = self._valve_states
+        for i in range(self.MAX_VALVES):
+            buf[i] = (mask >> i) & 1
+
+        if self._batching:
+            self._dirty = True
+            return
+
+        self._state_cache = None
+        error = _MUX_SET_ALL(iid, buf, 16)
+        self._check_error(error, "Set All Valves (mask)")
+
     def toggle(self, valve_idx: int, open_valve: bool):
         """Sets single valve using array method."""
         if not (1 <= valve_idx <= 16): return
-        
-        self._valve_states[valve_idx-1] = self.C_INT32(1 if open_valve else 0)
-        error = MUX_Wire_Set_all_valves(self._instr_id.value, self._valve_states, 16)
+
+        # Bind once: this runs in the tightest sequencing loops
+        states = self._valve_states
+        states[valve_idx-1] = 1 if open_valve else 0
+
+        if self._batching:
+            self._dirty = True
+            return
+
+        self._state_cache = None
+        error = _MUX_SET_ALL(self._instr_id.value, states, 16)
         self._check_error(error, f"Toggle Valve {valve_idx}")
 
     def set_individual_valve(self, valve_idx: int, state: bool):
         """Sets single valve using direct method (SDK: MUX_Set_indiv_valve)."""
         if self._instr_id.value < 0: return
-        
+
         val = 1 if state else 0
+
+        if self._batching:
+            self._valve_states[valve_idx-1] = val
+            self._dirty = True
+            return
+
+        self._state_cache = None
         error = MUX_Set_indiv_valve(
             self._instr_id.value, 
             self.C_INT32(valve_idx), 
@@ -84,18 +241,36 @@ class MuxWire(ElveflowCore):
         )
         
         if self._check_error(error, f"Set Indiv Valve {valve_idx}"):
-            self._valve_states[valve_idx-1] = self.C_INT32(val)
+            self._valve_states[valve_idx-1] = val
 
     def get_valve_state(self, valve_idx: int):
-        """Reads actual valve state from device (SDK: MUX_Get_valves_state)."""
+        """Reads actual valve state, served from a short-TTL cache when fresh."""
         if self._instr_id.value < 0: return None
-        
-        state_array = (self.C_INT32 * 16)(0)
+        if not (1 <= valve_idx <= 16): return None
+
+        if (self._state_cache is not None
+                and time.monotonic() - self._state_cache_time < self.STATE_TTL):
+            return self._state_cache[valve_idx-1]
+
+        states = self.get_all_valve_states()
+        return None if states is None else states[valve_idx-1]
+
+    def get_all_valve_states(self):
+        """
+        One bulk DAQ read of all 16 valve states (SDK: MUX_Get_valves_state).
+
+        Returns:
+            list of 16 ints, or None on error.
+        """
+        if self._instr_id.value < 0: return None
+
+        state_array = self._state_scratch
         error = MUX_Get_valves_state(self._instr_id.value, state_array, 16)
-        
+
         if self._check_error(error, "Get Valve States"):
-            if 1 <= valve_idx <= 16:
-                return state_array[valve_idx-1]
+            self._state_cache = list(state_array)
+            self._state_cache_time = time.monotonic()
+            return self._state_cache
         return None
 
     def set_trigger_out(self, high: bool):
@@ -118,10 +293,25 @@ class MuxWire(ElveflowCore):
         return None
 
     def close_all(self):
-        self.set_all([0]*16)
+        """Closes all 16 valves with one SDK write, without the [0]*16 list
+        build and per-element copy of set_all."""
+        if self._instr_id.value < 0: return
+
+        # memset covers the general mid-run case; at init the array is
+        # already zeroed and this is effectively free.
+        memset(self._valve_states, 0, sizeof(self._valve_states))
+
+        if self._batching:
+            self._dirty = True
+            return
+
+        self._state_cache = None
+        error = _MUX_SET_ALL(self._instr_id.value, self._valve_states, 16)
+        self._check_error(error, "Close All")
 
     def close(self):
         """SDK: MUX_Destructor."""
+        self._exec.shutdown(wait=True) # Let pending deferred commands land
         if self._instr_id.value >= 0:
             error = MUX_Destructor(self._instr_id.value)
             self._check_error(error, "Destructor")